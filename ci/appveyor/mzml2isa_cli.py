@@ -1,5 +1,4 @@
-from mzml2isa import parsing, mzml, isa
-import pronto
+from mzml2isa import parsing, mzml, isa, _obo
 
 
 if __name__ == '__main__':
@@ -9,4 +8,4 @@ if __name__ == '__main__':
     # this tmp list is so for automated checking
     # of code sees that we are using the imports
     # really they are just required for pyinstaller
-    tmp = [mzml, isa, pronto]
+    tmp = [mzml, isa, _obo]
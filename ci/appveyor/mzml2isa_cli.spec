@@ -4,7 +4,7 @@ block_cipher = None
 
 
 a = Analysis(['mzml2isa_cli.py'],
-             pathex=['..\\..\\mzml2isa', '..\\..\\.', 'C:\Python35\Lib\site-packages\pronto'],
+             pathex=['..\\..\\mzml2isa', '..\\..\\.'],
              binaries=None,
              datas= [ ('..\\..\\mzml2isa\\templates\\a_imzML.txt', 'mzml2isa\\templates' ),
 		      ('..\\..\\mzml2isa\\templates\\a_mzML.txt', 'mzml2isa\\templates' ),
@@ -14,7 +14,7 @@ a = Analysis(['mzml2isa_cli.py'],
                       ('..\\..\\mzml2isa\\templates\\s_mzML.txt', 'mzml2isa\\templates' ),
                       ('..\\..\\mzml2isa\\ontologies\\imagingMS.obo', 'mzml2isa\\ontologies' ),
 		      ('..\\..\\mzml2isa\\ontologies\\psi-ms.obo', 'mzml2isa\\ontologies' )],
-             hiddenimports=['pronto'],
+             hiddenimports=['mzml2isa._obo'],
              hookspath=['hook-openpyxl.py'],
              runtime_hooks=[],
              excludes=[],
@@ -1,6 +1,10 @@
 """Conditional imports of optional dependencies.
 """
 
+import contextlib
+import io
+import sys
+
 # --- Available Cache --------------------------------------------------------
 
 try:
@@ -15,34 +19,30 @@ except ImportError:
     from cached_property import cached_property
 
 
-# --- Available XML parser ---------------------------------------------------
-try:
-    from lxml import etree
-
-    def get_parent(element, tree):
-        """Finds every parent of a tree node.
-
-        Uses the method provided by lxml.etree
-        """
-        return element.getparent()
+# --- XML parser -------------------------------------------------------------
 
+from lxml import etree
 
-except ImportError:
-
-    try:
-        from xml.etree import cElementTree as etree
-    except ImportError:
-        from xml.etree import ElementTree as etree
 
-    def get_parent(element, tree):
-        """Finds every parent of a tree node.
+def parse_stripped(handle, local_name):
+    """Parses an XML document, dropping the text of some elements.
 
-        As xml.ElementTree has no **.getparent** method, the following was
-        proposed here : http://stackoverflow.com/questions/2170610#20132342
-        """
-        # {c:p for p in tree.iter() for c in p}[element]
-        # next(p for p in tree.iter() for c in p if c==element)
-        return next(p for p in tree.iter() if element in p)
+    Uses the tag filter of lxml.etree.XMLPullParser, so that the text of
+    each matching element is released as soon as it has been read.
+    """
+    parser = etree.XMLPullParser(events=("end",), tag="{*}" + local_name)
+    for chunk in iter(lambda: handle.read(io.DEFAULT_BUFFER_SIZE * 8), b""):
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            element.text = None
+    root = parser.close()
+    # NB: the tag filter keeps a reference to the last parsed document,
+    #     which refers back to the parser: feeding an empty document
+    #     breaks that cycle, so that the tree is freed with its last
+    #     reference instead of whenever the garbage collector runs
+    parser.feed(b"<_/>")
+    parser.close()
+    return etree.ElementTree(root)
 
 
 # --- Available package resources --------------------------------------------
@@ -64,3 +64,28 @@ try:
     import tqdm
 except ImportError:
     tqdm = None
+
+
+# --- Optional fast JSON parser ----------------------------------------------
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# --- Optional pronto type checking ------------------------------------------
+
+@contextlib.contextmanager
+def typechecks_disabled():
+    """Disable the runtime type checks of `pronto`, if it is in use.
+
+    A `pronto.Ontology` can only be given as a vocabulary if `pronto` was
+    imported already, so there is no need to import it otherwise.
+    """
+    meta = sys.modules.get("pronto.utils.meta")
+    if meta is None:
+        yield
+    else:
+        with meta.typechecked.disabled():
+            yield
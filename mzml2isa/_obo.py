@@ -0,0 +1,132 @@
+"""A minimal reader for the OBO controlled vocabularies shipped with mzml2isa.
+
+The parsers only need the identifier, the name and the ``is_a`` relations
+of the vocabulary terms, so instead of building a complete ontology graph,
+the OBO files are scanned once and only these fields are kept. The loaded
+`Vocabulary` exposes the subset of the `pronto.Ontology` API used by the
+parsers, so that any `pronto.Ontology` can still be used instead.
+"""
+
+import collections
+import io
+import re
+
+
+class Term(object):
+    """A term of a `Vocabulary`.
+
+    Attributes:
+        id (str): the identifier of the term.
+        name (str or None): the name of the term, if any.
+
+    """
+
+    __slots__ = ("_vocabulary", "id", "name")
+
+    def __init__(self, vocabulary, id, name):
+        self._vocabulary = vocabulary
+        self.id = id
+        self.name = name
+
+    def __repr__(self):
+        return "Term({!r}, name={!r})".format(self.id, self.name)
+
+    def subclasses(self, distance=None, with_self=True):
+        """Iterate over the subclasses of the term, in breadth-first order.
+        """
+        return self._vocabulary._walk(
+            self.id, self._vocabulary._children, distance, with_self
+        )
+
+    def superclasses(self, distance=None, with_self=True):
+        """Iterate over the superclasses of the term, in breadth-first order.
+        """
+        return self._vocabulary._walk(
+            self.id, self._vocabulary._parents, distance, with_self
+        )
+
+
+class Vocabulary(object):
+    """A controlled vocabulary loaded from an OBO file.
+
+    Only ``[Term]`` frames are read, and imports are not followed.
+    """
+
+    # `re.Pattern`: the start of a trailing comment in an unquoted OBO value.
+    _COMMENT = re.compile(r"(?<!\\)!")
+    # `re.Pattern`: an escaped character in an unquoted OBO value.
+    _ESCAPE = re.compile(r"\\(.)")
+    # dict: the characters that do not stand for themselves when escaped.
+    _ESCAPES = {"n": "\n", "t": "\t", "W": " "}
+
+    def __init__(self, path):
+        """Load a vocabulary from the OBO file at the given path.
+        """
+        self._names = {}
+        self._parents = collections.defaultdict(set)
+        self._children = collections.defaultdict(set)
+
+        with io.open(path, encoding="utf-8") as handle:
+            term_id = name = None
+            in_term = False
+            for line in handle:
+                if line.startswith("["):
+                    if term_id is not None:
+                        self._names.setdefault(term_id, name)
+                    term_id = name = None
+                    in_term = line.rstrip() == "[Term]"
+                elif in_term:
+                    tag, _, value = line.partition(":")
+                    if tag == "id":
+                        term_id = value.strip()
+                    elif tag == "name":
+                        name = self._unescape(value.strip())
+                    elif tag == "is_a":
+                        parent = value.split()[0]
+                        self._parents[term_id].add(parent)
+                        self._children[parent].add(term_id)
+            if term_id is not None:
+                self._names.setdefault(term_id, name)
+
+    def __contains__(self, id):
+        return id in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    @classmethod
+    def _unescape(cls, value):
+        value = cls._COMMENT.split(value, 1)[0].rstrip()
+        return cls._ESCAPE.sub(
+            lambda match: cls._ESCAPES.get(match.group(1), match.group(1)), value
+        )
+
+    def _walk(self, id, graph, distance, with_self):
+        # NB: this follows the same order as `pronto` lineage iterators, so
+        #     that both kinds of vocabularies give the same results.
+        distmax = float("inf") if distance is None else distance
+        linked, done = {id}, set()
+        frontier = collections.deque([(id, 0)])
+        queue = collections.deque([id] if with_self else [])
+        while frontier or queue:
+            if queue:
+                yield self.get_term(queue.popleft())
+                continue
+            node, depth = frontier.popleft()
+            done.add(node)
+            neighbors = graph.get(node)
+            if neighbors and depth < distmax:
+                for neighbor in sorted(neighbors - done):
+                    frontier.append((neighbor, depth + 1))
+                for neighbor in sorted(neighbors - linked):
+                    linked.add(neighbor)
+                    queue.append(neighbor)
+
+    def get_term(self, id):
+        """Get the term with the given identifier.
+
+        Raises:
+            `KeyError`: when no term with the given identifier exists.
+
+        """
+        return Term(self, id, self._names[id])
@@ -11,12 +11,9 @@ License:
     GNU General Public License version 3.0 (GPLv3)
 """
 import copy
-import warnings
 
-import pronto
-
-from . import ontologies
-from ._impl import importlib_resources
+from . import _obo, ontologies
+from ._impl import cache, importlib_resources
 from .mzml import _CVParameter, MzMLFile
 
 
@@ -33,16 +30,29 @@ class ImzMLFile(MzMLFile):
         }
     )
 
-    with warnings.catch_warnings(record=True): 
-        warnings.simplefilter('ignore', pronto.warnings.SyntaxWarning)
+    @classmethod
+    @cache
+    def _default_vocabulary(cls):
         with importlib_resources.path(ontologies.__name__, "imagingMS.obo") as filename:
-            _VOCABULARY = pronto.Ontology(filename)
+            # NB: ``imagingMS.obo`` imports ``psi-ms.obo``, which is loaded
+            #     as the MS vocabulary: instead of reading it again, MS terms
+            #     are looked up there (see `ImzMLFile._find_term`).
+            return _obo.Vocabulary(filename)
+
+    def _find_term(self, term_id):
+        try:
+            return super(ImzMLFile, self)._find_term(term_id)
+        except KeyError:
+            if self.vocabulary is not ImzMLFile._default_vocabulary():
+                raise
+            return MzMLFile._default_vocabulary().get_term(term_id)
 
     @classmethod
+    @cache
     def _assay_parameters(cls):
-        terms = super(ImzMLFile, cls)._assay_parameters()
+        terms = copy.copy(super(ImzMLFile, cls)._assay_parameters())
 
-        terms["file_content"] = [
+        terms["file_content"] = (
             _CVParameter(
                 accession="MS:1000525",
                 cv=True,
@@ -79,9 +89,9 @@ class ImzMLFile(MzMLFile):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["scan_settings"] = [
+        terms["scan_settings"] = (
             _CVParameter(
                 accession="IMS:1000040",
                 cv=True,
@@ -172,9 +182,9 @@ class ImzMLFile(MzMLFile):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["source"] = [
+        terms["source"] = (
             _CVParameter(
                 accession="IMS:1001213",
                 cv=True,
@@ -211,6 +221,6 @@ class ImzMLFile(MzMLFile):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
         return terms
@@ -44,6 +44,9 @@ class ISA_Tab(object):
             'Study file name', 'Written assays', etc.)
     """
 
+    # `re.Pattern`: a parameter column header in the ISA-Tab templates.
+    _PARAMETER_PATTERN = re.compile(r'Parameter Value\[(.*)\]')
+
     def __init__(self, out_dir, name, usermeta=None, **kwargs):
         """Setup the environments and the directories
 
@@ -278,5 +281,5 @@ class ISA_Tab(object):
         Return:
             str: the extracted substring
         """
-        match = re.match(r'Parameter Value\[(.*)\]', string)
+        match = ISA_Tab._PARAMETER_PATTERN.match(string)
         return match.group(1) if match is not None else string
@@ -26,24 +26,19 @@ import functools
 import ntpath
 import posixpath
 import re
+import typing
 import warnings
+import weakref
 
 import fs
 import fs.path
 import fs.errors
-import pronto
-from pronto.utils.meta import typechecked
+from . import _obo, ontologies
+from ._impl import parse_stripped, cache, cached_property, importlib_resources
+from ._impl import typechecks_disabled
 
-from . import ontologies
-from ._impl import etree, get_parent, cache, cached_property, importlib_resources
 
-
-class _CVParameter(
-    collections.namedtuple(
-        "_CVParameter",
-        ["accession", "cv", "name", "plus1", "value", "software", "merge"],
-    )
-):
+class _CVParameter(typing.NamedTuple):
     """A named tuple with controlled vocabulary parameter information.
 
     Attributes:
@@ -60,6 +55,38 @@ class _CVParameter(
 
     """
 
+    accession: str
+    cv: bool
+    name: str
+    plus1: bool
+    value: bool
+    software: bool
+    merge: bool
+
+
+# tuple: the instrument parameters extracted by `MzMLFile._extract_instrument`
+# (the instrument manufacturer is derived from the instrument term).
+_INSTRUMENT_PARAMETERS = (
+    _CVParameter(
+        accession="MS:1000031",
+        cv=True,
+        name="Instrument",
+        plus1=False,
+        value=False,
+        software=False,
+        merge=False,
+    ),
+    _CVParameter(
+        accession="MS:1000529",
+        cv=True,
+        name="Instrument serial number",
+        plus1=False,
+        value=True,
+        software=False,
+        merge=False,
+    ),
+)
+
 
 class MzMLFile(object):
     """An ``mzML`` file.
@@ -98,11 +125,19 @@ class MzMLFile(object):
         "ref_binary": "{scanList}/s:scan/s:referenceableParamGroupRef",
     }
 
-    with warnings.catch_warnings(record=True): 
-        warnings.simplefilter('ignore', pronto.warnings.SyntaxWarning)
-        with importlib_resources.path(ontologies.__name__, "psi-ms.obo") as filename:
-            # `~pronto.Ontology`: the default MS controlled vocabulary to use.
-            _VOCABULARY = pronto.Ontology(filename)
+    # dict: memoized term graph queries, indexed by vocabulary identity;
+    # entries are removed when their vocabulary is garbage collected.
+    _VOCABULARY_MEMOS = {}
+
+    # dict: URL prefixes of the controlled vocabularies, indexed by namespace.
+    _CV_URLS = {
+        "MS": "http://purl.obolibrary.org/obo/MS_",
+        "UO": "http://purl.obolibrary.org/obo/UO_",
+        "IMS": "http://www.maldi-msi.org/download/imzml/imagingMS.obo#IMS:",
+    }
+
+    # `re.Pattern`: the attribute tested in an environment attribute XPath.
+    _ATTRIBUTE_PATTERN = re.compile(r"\[@(.*)\]")
 
     def __init__(self, filesystem, path, vocabulary=None):
         """Open an ``mzML`` file from the given filesystem and path.
@@ -111,8 +146,11 @@ class MzMLFile(object):
             filesystem (`str` or `~fs.base.FS`): the filesystem the file is
                 located on, either as a filesystem instance or an FS URL.
             path (str): the path to the file on the provided filesystem.
-            vocabulary (`~pronto.Ontology`, optional): a controlled vocabulary
-                to use (or `None` to use the default one).
+            vocabulary (`~mzml2isa._obo.Vocabulary`, optional): a controlled
+                vocabulary to use (or `None` to use the default one). Any
+                object with a compatible ``get_term`` method, returning terms
+                with ``subclasses`` and ``superclasses`` methods, such as a
+                `pronto.Ontology`, can be used as well.
 
         Raises:
             `~fs.errors.ResourceNotFound`: when the path does not exist
@@ -121,13 +159,29 @@ class MzMLFile(object):
         """
         self.fs = fs.open_fs(filesystem)
         self.path = path
-        self.vocabulary = vocabulary or self._VOCABULARY
+        self.vocabulary = vocabulary or self._default_vocabulary()
 
         if self.fs.getinfo(self.path).is_dir:
             raise fs.errors.FileExpected(self.path)
 
     # COMPATIBILITY LAYER WITH IMZML #########################################
 
+    # NB: OVERRIDE ME IN SUBCLASSES
+    @classmethod
+    @cache
+    def _default_vocabulary(cls):
+        """Load the default controlled vocabulary to use.
+
+        The vocabulary is only parsed the first time it is needed, and then
+        shared by every file of the same class.
+
+        Returns:
+            `~mzml2isa._obo.Vocabulary`: the default MS controlled vocabulary.
+
+        """
+        with importlib_resources.path(ontologies.__name__, "psi-ms.obo") as filename:
+            return _obo.Vocabulary(filename)
+
     # NB: OVERRIDE ME IN SUBCLASSES
     @classmethod
     def _environment_paths(cls):
@@ -223,14 +277,16 @@ class MzMLFile(object):
             ]
         )
 
-    # NB:
+    # NB: the parameter collections are built once per class and shared
+    #     between instances, so subclasses must copy them before editing.
     @classmethod
+    @cache
     def _assay_parameters(cls):
         """Return a collection of CV parameters to extract from the file.
         """
         terms = collections.OrderedDict()
 
-        terms["file_content"] = [
+        terms["file_content"] = (
             _CVParameter(
                 accession="MS:1000524",
                 cv=True,
@@ -249,9 +305,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["source_file"] = [
+        terms["source_file"] = (
             _CVParameter(
                 accession="MS:1000767",
                 cv=True,
@@ -279,9 +335,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["contact"] = [
+        terms["contact"] = (
             _CVParameter(
                 accession="MS:1000586",
                 cv=True,
@@ -327,9 +383,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["ionization"] = [
+        terms["ionization"] = (
             _CVParameter(
                 accession="MS:1000482",
                 cv=False,
@@ -357,9 +413,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["analyzer"] = [
+        terms["analyzer"] = (
             _CVParameter(
                 accession="MS:1000480",
                 cv=False,
@@ -378,9 +434,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["detector"] = [
+        terms["detector"] = (
             _CVParameter(
                 accession="MS:1000481",
                 cv=False,
@@ -408,9 +464,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        ]
+        )
 
-        terms["data_processing"] = [
+        terms["data_processing"] = (
             _CVParameter(
                 accession="MS:1000630",
                 cv=False,
@@ -429,17 +485,18 @@ class MzMLFile(object):
                 software=True,
                 merge=False,
             ),
-        ]
+        )
 
         return terms
 
     @classmethod
+    @cache
     def _scan_parameters(cls):
         """Return a collection of CV parameters to extract from each scan.
         """
         terms = collections.OrderedDict()
 
-        terms["scan_sp"] = terms["ref_sp"] = {
+        terms["scan_sp"] = terms["ref_sp"] = frozenset({
             _CVParameter(
                 accession="MS:1000524",
                 cv=True,
@@ -548,9 +605,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
-        terms["scan_combination"] = terms["ref_combination"] = {
+        terms["scan_combination"] = terms["ref_combination"] = frozenset({
             _CVParameter(
                 accession="MS:1000570",
                 cv=True,
@@ -560,9 +617,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             )
-        }
+        })
 
-        terms["scan_configuration"] = {
+        terms["scan_configuration"] = frozenset({
             _CVParameter(
                 accession="MS:1000016",
                 cv=False,
@@ -617,9 +674,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
-        terms["scan_isolation_window"] = {
+        terms["scan_isolation_window"] = frozenset({
             _CVParameter(
                 accession="MS:1000827",
                 cv=False,
@@ -647,9 +704,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
-        terms["scan_selected_ion"] = {
+        terms["scan_selected_ion"] = frozenset({
             _CVParameter(
                 accession="MS:1000744",
                 cv=False,
@@ -677,9 +734,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
-        terms["scan_activation"] = {
+        terms["scan_activation"] = frozenset({
             _CVParameter(
                 accession="MS:1000044",
                 cv=True,
@@ -698,9 +755,9 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
-        terms["scan_binary"] = terms["ref_binary"] = {
+        terms["scan_binary"] = terms["ref_binary"] = frozenset({
             _CVParameter(
                 accession="MS:1000518",
                 cv=True,
@@ -728,7 +785,7 @@ class MzMLFile(object):
                 software=False,
                 merge=False,
             ),
-        }
+        })
 
         return terms
 
@@ -764,48 +821,113 @@ class MzMLFile(object):
                 one of the following ontologies: **MS**, **UO**, or **IMS**.
 
         """
-        try:
-            namespace, id_ = accession.split(":", 1)
-            if namespace in {"MS", "UO"}:
-                url = "http://purl.obolibrary.org/obo/{}_{}"
-            elif namespace == "IMS":
-                url = "http://www.maldi-msi.org/download/imzml/imagingMS.obo#{}:{}"
-            else:
-                url = "{}:{}"
-            return url.format(namespace, id_)
-        except ValueError:
+        namespace, sep, id_ = accession.partition(":")
+        prefix = cls._CV_URLS.get(namespace)
+        if prefix is None or not sep:
             return accession
+        return prefix + id_
+
+    def _find_term(self, term_id):
+        """Find the vocabulary term with the given identifier.
+
+        Raises:
+            `KeyError`: when the term cannot be found in the vocabulary.
+
+        """
+        return self.vocabulary.get_term(term_id)
+
+    def _get_term_name(self, term_id):
+        """Return the name of the vocabulary term with the given identifier.
+
+        Names are memoized with the other vocabulary queries, so that
+        resolving a term already seen is a single dictionary lookup
+        instead of a search through the vocabulary and its imports.
+
+        Raises:
+            `KeyError`: when the term cannot be found in the vocabulary.
+
+        """
+        memo = self._vocabulary_memo()
+        key = ("name", term_id)
+        if key not in memo:
+            memo[key] = self._find_term(term_id).name
+        return memo[key]
+
+    def _vocabulary_memo(self):
+        """Return the memoized term graph queries for the current vocabulary.
+
+        Queries are memoized per vocabulary rather than per instance, so
+        that the term graph is only traversed once for a given query no
+        matter how many files are parsed with the same vocabulary.
+        """
+        key = id(self.vocabulary)
+        try:
+            return self._VOCABULARY_MEMOS[key]
+        except KeyError:
+            memo = self._VOCABULARY_MEMOS[key] = {}
+            # NB: the memo is dropped when the vocabulary is collected, so
+            #     that custom vocabularies are not kept alive forever, and
+            #     that their `id` cannot be reused while the memo exists;
+            #     this requires the memo to never hold a vocabulary term
+            weakref.finalize(self.vocabulary, self._VOCABULARY_MEMOS.pop, key, None)
+            return memo
 
-    @cache
     def _get_descendents(self, term_id, with_self=True, distance=None):
-        return (
-            self.vocabulary.get_term(term_id)
-                        .subclasses(with_self=with_self, distance=distance)
-                        .to_set()
-                        .ids
-        )
+        """Return the identifiers of the subclasses of a vocabulary term.
+        """
+        memo = self._vocabulary_memo()
+        key = ("descendents", term_id, with_self, distance)
+        if key not in memo:
+            memo[key] = frozenset(
+                term.id
+                for term in self._find_term(term_id).subclasses(
+                    with_self=with_self, distance=distance
+                )
+            )
+        return memo[key]
+
+    def _get_ancestors(self, term_id):
+        """Return the identifiers of the superclasses of a vocabulary term.
+
+        The identifiers are returned in breadth-first order, closest
+        superclasses first, and do not include ``term_id`` itself.
+        """
+        memo = self._vocabulary_memo()
+        key = ("ancestors", term_id)
+        if key not in memo:
+            memo[key] = tuple(
+                term.id
+                for term in self._find_term(term_id).superclasses(
+                    with_self=False
+                )
+            )
+        return memo[key]
 
     # ENVIRONMENT ############################################################
 
     @cached_property
     def tree(self):  # noqa: D401
         """An XML element tree representation of the ``mzML`` file.
+
+        The encoded binary data arrays, which make up most of an ``mzML``
+        file, are never used to extract metadata: their text is dropped
+        while the file is being parsed so that it is not kept in memory.
         """
+        # NB: local files are read directly, without going through the
+        #     wrappers of the filesystem layer
         if self.fs.hassyspath(self.path):
-            return etree.parse(self.fs.getsyspath(self.path))
-        with self.fs.openbin(self.path) as handle:
-            return etree.parse(handle)
+            handle = open(self.fs.getsyspath(self.path), "rb")
+        else:
+            handle = self.fs.openbin(self.path)
+        with handle:
+            return parse_stripped(handle, "binary")
 
     @cached_property
     def namespaces(self):  # noqa: D401
         """The XML namespace of the ``mzML`` file.
         """
-        root = self.tree.getroot()
-        try:
-            ns = root.nsmap
-            ns["s"] = ns.pop(None)
-        except AttributeError:
-            ns = {"s": re.search(r"^{(.*)}", root.tag).group(1)}
+        ns = self.tree.getroot().nsmap
+        ns["s"] = ns.pop(None)
         return ns
 
     @cached_property
@@ -833,7 +955,7 @@ class MzMLFile(object):
         for key, paths in self._environment_attributes().items():
             for path in paths:
                 if self.tree.find(path.format(**env), ns) is not None:
-                    env[key] = re.search(r"\[@(.*)\]", path).group(1)
+                    env[key] = self._ATTRIBUTE_PATTERN.search(path).group(1)
                     break
             else:
                 env[key] = None
@@ -854,8 +976,18 @@ class MzMLFile(object):
             query (str): an XPath query to find elements with.
 
         """
-        ns = self.namespaces
-        return self.tree.iterfind(query.format(**self.environment), ns)
+        try:
+            path = self._expanded_xpaths[query]
+        except KeyError:
+            path = self._expanded_xpaths[query] = query.format(**self.environment)
+        return self.tree.iterfind(path, self.namespaces)
+
+    @cached_property
+    def _expanded_xpaths(self):  # noqa: D401
+        """A cache of XPath queries expanded with the file environment.
+        """
+        # dict: query -> query with its environment shortcuts expanded
+        return {}
 
     @cached_property
     def _referenceable_parameters(self):  # noqa: D401
@@ -865,6 +997,17 @@ class MzMLFile(object):
             x.attrib["id"]: x for x in self._find_xpath(self._XPATHS["ic_elements"])
         }
 
+    @cached_property
+    def _software_elements(self):  # noqa: D401
+        """A collection of XML software elements, indexed by their ID.
+        """
+        # NB: only keep the first element with a given ID, like a search
+        #     through the software list would, in case IDs are duplicated
+        elements = {}
+        for x in self._find_xpath(self._XPATHS["software_elements"]):
+            elements.setdefault(x.attrib["id"], x)
+        return elements
+
     # METADATA ###############################################################
 
     def _extract_software(self, software_ref, name, meta):
@@ -875,27 +1018,25 @@ class MzMLFile(object):
 
         # Make sure we don't end up with "Parameter Name Software" but with
         # "Parameter Software" even if ``name`` is "Parameter Name"
-        name = re.sub(r" Name$", "", name)
-
-        # Loop through software referenceable elements and attempt to find
-        # the right one
-        for element in self._find_xpath(self._XPATHS["software_elements"]):
-            if element.attrib["id"] == software_ref:
-                # extract the version from the software attributes
-                if "version" in element.attrib:
-                    version = {"value": element.attrib["version"]}
-                # get the controlled vocabulary term for the instrument
-                param = next(
-                    element.iterfind(self.environment["software_params"], ns), None
-                )
-                if param is not None:
-                    software = {
-                        "accession": param.attrib["accession"],
-                        "name": param.attrib["name"],
-                        "ref": param.attrib[self.environment["cvRef"]],
-                    }
-                # stop searching for other softwares
-                break
+        if name.endswith(" Name"):
+            name = name[: -len(" Name")]
+
+        # Find the referenced software element, if any
+        element = self._software_elements.get(software_ref)
+        if element is not None:
+            # extract the version from the software attributes
+            if "version" in element.attrib:
+                version = {"value": element.attrib["version"]}
+            # get the controlled vocabulary term for the instrument
+            param = next(
+                element.iterfind(self.environment["software_params"], ns), None
+            )
+            if param is not None:
+                software = {
+                    "accession": param.attrib["accession"],
+                    "name": param.attrib["name"],
+                    "ref": param.attrib[self.environment["cvRef"]],
+                }
 
         # update the metadata dictionary with the extracted software and
         # version, if any
@@ -904,65 +1045,90 @@ class MzMLFile(object):
         if version is not None:
             meta["{} software version".format(name)] = version
 
-    def _extract_cv_params(self, element, parameters, meta):
+    def _index_parameters(self, parameters):
+        """Index some CV parameters by the accessions they accept.
+
+        Arguments:
+            parameters (list): a list of `_CVParameter` to index.
+
+        Returns:
+            dict: a mapping of every accession accepted by at least one of
+            the ``parameters`` (the parameter accession itself, or any of its
+            descendents) to the list of `_CVParameter` accepting it.
+
+        """
+        memo = self._vocabulary_memo()
+        # NB: the index keeps the order of `parameters`, which decides the
+        #     parameter filling the metadata first, so the key does too
+        key = ("parameters", tuple(parameters))
+        if key not in memo:
+            index = {}
+            for param_info in parameters:
+                for accession in self._get_descendents(param_info.accession):
+                    index.setdefault(accession, []).append(param_info)
+            memo[key] = index
+        return memo[key]
+
+    def _extract_cv_params(self, element, index, meta):
         """Attempt to extract some CV parameters from the given element.
 
         Arguments:
             element (`~xml.etree.ElementTree.Element`): an XML element with
                 possible ``cvParam`` children.
-            parameters (list): a list of `_CVParameter` to use as a reference.
+            index (dict): an index of `_CVParameter` to use as a reference,
+                as returned by `_index_parameters`.
             meta (dict): the metadata dictionary to enrich.
 
         """
-        for param_info in parameters:
-            descendents = self._get_descendents(param_info.accession)
-            if element.attrib["accession"] in descendents:
-                param = {}
-
-                if param_info.cv:
-                    param["accession"] = element.attrib["accession"]
-                    param["name"] = element.attrib["name"]
-                    param["ref"] = element.attrib[self.environment["cvRef"]]
-
-                if param_info.value:
-                    param["value"] = element.attrib["value"]  # TODO transtype
-
-                # try getting a unit
-                try:
-                    param["unit"] = {
-                        "name": element.attrib["unitName"],
-                        "ref": element.attrib["unitCvRef"],
-                        "accession": element.attrib["unitAccession"],
-                    }
-                except KeyError:
-                    pass
-
-                if param_info.plus1:
-                    # setup the dictionary for multiple entries
-                    entries = meta.setdefault(param_info.name, dict(entry_list=[]))[
-                        "entry_list"
-                    ]
-                    if not param_info.merge or param not in entries:
-                        entries.append(param)
-                else:
-                    meta[param_info.name] = param
+        attrib = element.attrib
+        cv_ref = self.environment["cvRef"]
+
+        for param_info in index.get(attrib["accession"], ()):
+            param = {}
+
+            if param_info.cv:
+                param["accession"] = attrib["accession"]
+                param["name"] = attrib["name"]
+                param["ref"] = attrib[cv_ref]
+
+            if param_info.value:
+                param["value"] = attrib["value"]  # TODO transtype
+
+            # try getting a unit
+            try:
+                param["unit"] = {
+                    "name": attrib["unitName"],
+                    "ref": attrib["unitCvRef"],
+                    "accession": attrib["unitAccession"],
+                }
+            except KeyError:
+                pass
+
+            if param_info.plus1:
+                # setup the dictionary for multiple entries
+                entries = meta.setdefault(param_info.name, dict(entry_list=[]))[
+                    "entry_list"
+                ]
+                if not param_info.merge or param not in entries:
+                    entries.append(param)
+            else:
+                meta[param_info.name] = param
 
-                if param_info.software:
-                    try:  # softwareRef in <Processing Method>
-                        soft_ref = get_parent(element, self.tree).attrib["softwareRef"]
-                    except KeyError:  # softwareRef in <DataProcessing>
-                        soft_ref = get_parent(
-                            get_parent(element, self.tree), self.tree
-                        ).attrib["softwareRef"]
-                    self._extract_software(soft_ref, param_info.name, meta)
+            if param_info.software:
+                try:  # softwareRef in <Processing Method>
+                    soft_ref = element.getparent().attrib["softwareRef"]
+                except KeyError:  # softwareRef in <DataProcessing>
+                    soft_ref = element.getparent().getparent().attrib["softwareRef"]
+                self._extract_software(soft_ref, param_info.name, meta)
 
     def _extract_assay_parameters(self, meta):
         """Extract assay parameters into the metadata dictionary.
         """
         terms = self._assay_parameters()
-        for location, term in terms.items():
+        for location, parameters in terms.items():
+            index = self._index_parameters(parameters)
             for element in self._find_xpath(self._XPATHS[location]):
-                self._extract_cv_params(element, terms[location], meta)
+                self._extract_cv_params(element, index, meta)
 
     def _extract_derived_file(self, meta):
         """Extract derived file information into the metadata dictionary.
@@ -982,15 +1148,17 @@ class MzMLFile(object):
         except StopIteration:
             warnings.warn("Could not find any metadata about Raw Spectral Data File.")
 
-    def _extract_polarity(self, meta):
+    def _extract_polarity(self, meta, spectrum_params):
         """Extract scan polarity information into the metadata dictionary.
-        """
-        sp_cv = self._find_xpath(self._XPATHS["sp_cv"])
-        pos = neg = False
 
-        for i in sp_cv:
-            pos |= i.attrib["accession"] == "MS:1000130"
-            neg |= i.attrib["accession"] == "MS:1000129"
+        Arguments:
+            meta (dict): the metadata dictionary to enrich.
+            spectrum_params (dict): the spectrum CV parameters, indexed by
+                accession, as collected by `_extract_scan_parameters`.
+
+        """
+        pos = "MS:1000130" in spectrum_params
+        neg = "MS:1000129" in spectrum_params
 
         meta["Scan polarity"] = (
             {"name": "alternating scan", "ref": "", "accession": ""}
@@ -1002,12 +1170,12 @@ class MzMLFile(object):
             else {"name": "n/a", "ref": "", "accession": ""}
         )
 
-    def _extract_spectrum_representation(self, meta):
+    def _extract_spectrum_representation(self, meta, spectrum_params):
         """Extract spectrum representation into the metadata dictionary.
         """
         representations = self._get_descendents("MS:1000525", with_self=False)
-        for element in self._find_xpath(self._XPATHS["sp_cv"]):
-            if element.attrib["accession"] in representations:
+        for accession, element in spectrum_params.items():
+            if accession in representations:
                 meta["Spectrum representation"] = {
                     "entry_list": [
                         {
@@ -1023,33 +1191,32 @@ class MzMLFile(object):
         """Extract scan timerange into the metadata dictionary.
         """
         try:
-            scan_cv = self._find_xpath(self._XPATHS["scan_cv"])
-            times = [
-                float(i.attrib["value"])
-                for i in scan_cv
-                if i.attrib["accession"] == "MS:1000016"
-            ]
-            meta["Time range"] = {
-                "value": "{:.3f}-{:.3f}".format(min(times), max(times))
-            }
-
-            unit = next(
-                (
-                    i
-                    for i in self._find_xpath(self._XPATHS["scan_cv"])
-                    if i.attrib["accession"] == "MS:1000016" and "unitName" in i.attrib
-                ),
-                None,
-            )
+            start = end = unit = None
+            for element in self._find_xpath(self._XPATHS["scan_cv"]):
+                attrib = element.attrib
+                if attrib["accession"] != "MS:1000016":
+                    continue
+                # keep a running range instead of collecting every time
+                time = float(attrib["value"])
+                if start is None:
+                    start = end = time
+                if time < start:
+                    start = time
+                if time > end:
+                    end = time
+                if unit is None and "unitName" in attrib:
+                    unit = {
+                        "name": attrib["unitName"],
+                        "accession": attrib["unitAccession"],
+                        "ref": attrib.get(
+                            "unitCvRef", attrib[self.environment["cvRef"]]
+                        ),
+                    }
 
-            if unit is not None:
-                meta["Time range"]["unit"] = {
-                    "name": unit.attrib["unitName"],
-                    "accession": unit.attrib["unitAccession"],
-                    "ref": unit.attrib.get(
-                        "unitCvRef", unit.attrib[self.environment["cvRef"]]
-                    ),
-                }
+            if start is not None:
+                meta["Time range"] = {"value": "{:.3f}-{:.3f}".format(start, end)}
+                if unit is not None:
+                    meta["Time range"]["unit"] = unit
 
         except ValueError:
             pass
@@ -1058,24 +1225,30 @@ class MzMLFile(object):
         """Extract scan m/z range into the metadata dictionary.
         """
         try:
-            minmz = []
-            maxmz = []
-            unit = None
+            minmz = maxmz = unit = None
 
             for element in self._find_xpath(self._XPATHS["scan_window_cv"]):
-                if element.attrib["accession"] == "MS:1000501":
-                    minmz.append(float(element.attrib["value"]))
-                    if unit is None and "unitName" in element.attrib:
+                attrib = element.attrib
+                if attrib["accession"] == "MS:1000501":
+                    value = float(attrib["value"])
+                    if minmz is None or value < minmz:
+                        minmz = value
+                    if unit is None and "unitName" in attrib:
                         unit = {
-                            "name": element.attrib["unitName"],
-                            "ref": element.attrib["unitCvRef"],
-                            "accession": element.attrib["unitAccession"],
+                            "name": attrib["unitName"],
+                            "ref": attrib["unitCvRef"],
+                            "accession": attrib["unitAccession"],
                         }
-                elif element.attrib["accession"] == "MS:1000500":
-                    maxmz.append(float(element.attrib["value"]))
+                elif attrib["accession"] == "MS:1000500":
+                    value = float(attrib["value"])
+                    if maxmz is None or value > maxmz:
+                        maxmz = value
+
+            if minmz is None or maxmz is None:
+                raise ValueError("missing scan window limits")
 
             meta["Scan m/z range"] = {
-                "value": "{}-{}".format(int(min(minmz)), int(max(maxmz)))
+                "value": "{}-{}".format(int(minmz), int(maxmz))
             }
 
             if unit is not None:
@@ -1085,32 +1258,19 @@ class MzMLFile(object):
             if type(self) is MzMLFile:
                 warnings.warn("Could not find any m/z range")
 
-    def _extract_data_file_content(self, meta):
+    def _extract_data_file_content(self, meta, spectrum_params):
         """Extract data file content into the metadata dictionary.
         """
-
         file_contents = self._get_descendents("MS:1000524", with_self=False)
-
-        def unique_everseen(it, key):
-            memo = set()
-            for element in it:
-                signature = key(element)
-                if signature not in seen:
-                    seen.add(signature)
-                    yield element
-
         meta["Data file content"] = {
             "entry_list": [
                 {
                     "name": cv.attrib["name"],
                     "ref": cv.attrib[self.environment["cvRef"]],
-                    "accession": cv.attrib["accession"],
+                    "accession": accession,
                 }
-                for cv in unique_everseen(
-                    self._find_xpath(self._XPATHS["sp_cv"]),
-                    key=lambda cv: cv.attrib["accession"],
-                )
-                if cv.attrib["accession"] in file_contents
+                for accession, cv in spectrum_params.items()
+                if accession in file_contents
             ]
         }
 
@@ -1124,47 +1284,29 @@ class MzMLFile(object):
         instrument = self._find_instrument_config()
         manufacturers = self._get_descendents("MS:1000031", with_self=False, distance=1)
 
-        # The parameters we want to extract (Instrument Manufacturer will be
-        # handled differently later)
-        parameters = [
-            _CVParameter(
-                accession="MS:1000031",
-                cv=True,
-                name="Instrument",
-                plus1=False,
-                value=False,
-                software=False,
-                merge=False,
-            ),
-            _CVParameter(
-                accession="MS:1000529",
-                cv=True,
-                name="Instrument serial number",
-                plus1=False,
-                value=True,
-                software=False,
-                merge=False,
-            ),
-        ]
-
         # Extract the CV parameters
+        index = self._index_parameters(_INSTRUMENT_PARAMETERS)
         for param in instrument.iterfind("s:cvParam", self.namespaces):
-            self._extract_cv_params(param, parameters, meta)
+            self._extract_cv_params(param, index, meta)
 
         if "Instrument" in meta:
             # Check the instrument name and accession are the same
-            term = self.vocabulary.get_term(meta["Instrument"]["accession"])
-            if meta["Instrument"]["name"] != term.name:
+            term_id = meta["Instrument"]["accession"]
+            term_name = self._get_term_name(term_id)
+            if meta["Instrument"]["name"] != term_name:
                 msg = "The instrument name in the mzML file ({}) does not correspond to the instrument accession ({})"
-                warnings.warn(msg.format(meta["Instrument"]["name"], term.name))
-                meta["Instrument"]["name"] = term.name
+                warnings.warn(msg.format(meta["Instrument"]["name"], term_name))
+                meta["Instrument"]["name"] = term_name
 
             # Get the instrument manufacturer
-            man = next((p for p in term.superclasses(with_self=False) if p.id in manufacturers), term)
+            man_id = next(
+                (p for p in self._get_ancestors(term_id) if p in manufacturers),
+                term_id,
+            )
             meta["Instrument manufacturer"] = {
-                "accession": man.id,
-                "name": man.name,
-                "ref": man.id.split(":")[0],
+                "accession": man_id,
+                "name": self._get_term_name(man_id),
+                "ref": man_id.split(":")[0],
             }
 
         try:  # Get associated software
@@ -1197,20 +1339,39 @@ class MzMLFile(object):
 
         Depending on the `_CVParameter.merge` attribute, some entry list will
         be deduplicated.
+
+        Returns:
+            `collections.OrderedDict`: the first ``cvParam`` element found
+            for each accession directly under a spectrum, in document order,
+            so that the other spectrum-level extractors do not need to
+            traverse the spectrum list again.
+
         """
         terms = self._scan_parameters()
         ns = self.namespaces
+        spectrum_params = collections.OrderedDict()
+
+        # the XPaths only depend on the environment, so format them once
+        indices = [
+            (
+                location.startswith("ref"),
+                self._XPATHS[location].format(**self.environment),
+                self._index_parameters(parameters),
+            )
+            for location, parameters in terms.items()
+        ]
 
         for spectrum in self._find_xpath(self._XPATHS["sp"]):
-            for location, parameters in terms.items():
-                xpath = self._XPATHS[location].format(**self.environment)
+            for element in spectrum.iterfind(self._XPATHS["scan_sp"], ns):
+                spectrum_params.setdefault(element.attrib["accession"], element)
+            for referenced, xpath, index in indices:
                 # we are extracting from a referenced parameter group
                 # so we must retrieve them before being able to extract
                 # the CV parameters
-                if location.startswith("ref"):
+                if referenced:
                     params = (
                         self._referenceable_parameters[ref.attrib["ref"]]
-                        for ref in spectrum.iterfind(xpath, self.namespaces)
+                        for ref in spectrum.iterfind(xpath, ns)
                     )
                     elements = (
                         element
@@ -1222,7 +1383,9 @@ class MzMLFile(object):
                     elements = spectrum.iterfind(xpath, ns)
 
                 for element in elements:
-                    self._extract_cv_params(element, parameters, meta)
+                    self._extract_cv_params(element, index, meta)
+
+        return spectrum_params
 
     def _find_instrument_config(self):
         """Find the instrument configuration XML element.
@@ -1260,21 +1423,21 @@ class MzMLFile(object):
     def metadata(self):
         meta = {}
 
-        with typechecked.disabled():
+        with typechecks_disabled():
             self._extract_assay_parameters(meta)
             self._extract_instrument(meta)
             self._extract_derived_file(meta)
             self._extract_raw_file(meta)
-            self._extract_polarity(meta)
             self._extract_timerange(meta)
             self._extract_mzrange(meta)
             self._extract_scan_number(meta)
-            self._extract_scan_parameters(meta)
 
+            spectrum_params = self._extract_scan_parameters(meta)
+            self._extract_polarity(meta, spectrum_params)
             if "Spectrum representation" not in meta:
-                self._extract_spectrum_representation(meta)
+                self._extract_spectrum_representation(meta, spectrum_params)
             if "Data file content" not in meta:
-                self._extract_data_file_content(meta)
+                self._extract_data_file_content(meta, spectrum_params)
 
             if "Spectrum representation" in meta:
                 self._merge_spectrum_representation(meta)
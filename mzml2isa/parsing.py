@@ -21,15 +21,20 @@ License:
 import argparse
 import contextlib
 import functools
-import multiprocessing.pool
+import multiprocessing
+import operator
 import os
 import sys
 import warnings
 
 import fs
+import fs.copy
+import fs.errors
 import fs.path
+import fs.tempfs
+import fs.wildcard
 
-from . import __author__, __version__, __name__, __license__
+from . import __author__, __version__, __license__
 from .isa import ISA_Tab
 from .mzml import MzMLFile
 from .imzml import ImzMLFile
@@ -38,15 +43,17 @@ from .utils import merge_spectra, star_args
 from ._impl import tqdm
 
 
+# dict: the metadata extractor to use, indexed by file extension.
+_PARSERS = {"mzML": MzMLFile, "imzML": ImzMLFile}
+
+
 @star_args
 def _parse_file(filesystem, path, parser):
-    """Parse a single file using a cache ontology and a metadata extractor
+    """Parse a single file using a metadata extractor
 
     Arguments:
         filesystem (FS URL or FS): the filesystem the file is located on
         path (str): filesystem path to the (i)mzML file
-        ontology (pronto.Ontology): the cached ontology to use
-            (either IMS or MS)
         parser (mzml.mzMLmeta): the parser to use on the file
             (either mzml2isa.mzml.mzMLmeta or mzml2isa.mzml.imzMLmeta)
 
@@ -56,6 +63,92 @@ def _parse_file(filesystem, path, parser):
     return parser(filesystem, path).metadata
 
 
+def _extract(filesystem, tmp_fs, names, stored_names):
+    """Copy files to a temporary filesystem, in the order they are stored in.
+
+    Files in an archive are only read once this way, sequentially, instead
+    of once per worker and in the parsing order (which, for a compressed
+    archive, may decompress it several times).
+
+    Arguments:
+        filesystem (FS): the filesystem the files are located on
+        tmp_fs (FS): the filesystem to copy the files to
+        names (list): the paths to the files, in parsing order
+        stored_names (list): the same paths, in storage order
+
+    Yields:
+        tuple: the index of a file in ``names`` and its path, as soon as
+        it has been copied, so that it can be parsed while the next files
+        are being extracted.
+    """
+    indices = {name: index for index, name in enumerate(names)}
+    for name in stored_names:
+        fs.copy.copy_file(filesystem, name, tmp_fs, name)
+        yield indices[name], name
+
+
+def _readahead(filesystem, files):
+    """Iterate over files, asking the OS to read the next file early.
+
+    While a file is being parsed, the kernel is told the next one will be
+    needed soon, so reading it from disk overlaps with parsing. This only
+    applies to files with a system path, on platforms with `os.posix_fadvise`.
+
+    Arguments:
+        filesystem (FS): the filesystem the files are located on
+        files (iterable): the indices and paths of the files, in parsing
+            order
+
+    Yields:
+        tuple: the indices and paths of the files, in the same order
+    """
+    files = iter(files)
+    current = next(files, None)
+    while current is not None:
+        upcoming = next(files, None)
+        if upcoming is not None and hasattr(os, "posix_fadvise"):
+            try:
+                with open(filesystem.getsyspath(upcoming[1]), "rb") as handle:
+                    os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            except (fs.errors.NoSysPath, OSError):
+                pass
+        yield current
+        current = upcoming
+
+
+# the filesystem and parser used by the current worker process of a pool
+_worker_filesystem = None
+_worker_parser = None
+
+
+def _init_worker(root, parser, filters):
+    """Prepare a worker process to parse files from the given directory.
+
+    Filesystems cannot be pickled, so every worker opens its own from the
+    system path of the directory, and reuses it for all the files it is sent.
+
+    Arguments:
+        root (str): the system path of the directory containing the files
+        parser (type): the parser to use on the files
+        filters (list): the warnings filters of the parent process
+    """
+    global _worker_filesystem, _worker_parser
+    _worker_filesystem = fs.open_fs(root)
+    _worker_parser = parser
+    warnings.filters[:] = filters
+
+
+@star_args
+def _parse_worker_file(index, path):
+    """Parse a single file in a worker process set up by `_init_worker`.
+
+    Returns:
+        tuple: the index of the file and a dictionary containing the
+        extracted metadata, so that results can be reordered.
+    """
+    return index, _parse_file((_worker_filesystem, path, _worker_parser))
+
+
 def convert(
     in_path,
     out_path,
@@ -93,40 +186,75 @@ def convert(
         verbose (bool): display more output [default: True]
     """
 
-    PARSERS = {"mzML": MzMLFile, "imzML": ImzMLFile}
-
     # open user metadata file if any
     meta_loader = UserMetaLoader(usermeta)
 
     # open the filesystem containing the files
     with fs.open_fs(in_path) as filesystem:
 
-        # get all mzML files
-        mzml_files = list(
-            filesystem.filterdir("/", files=["*mzML"], exclude_dirs=["*"])
-        )
+        # get the names of all mzML files, in order, building the name
+        # matcher once instead of once per directory entry
+        case_sensitive = not filesystem.getmeta().get("case_insensitive", False)
+        is_mzml = fs.wildcard.get_matcher(["*mzML"], case_sensitive)
+        stored_files = [
+            info.name
+            for info in filesystem.scandir("/")
+            if info.is_file and is_mzml(info.name)
+        ]
+        mzml_files = sorted(stored_files)
 
         if mzml_files:
             # store the first mzml_files extension
-            extension = mzml_files[0].name.rsplit(os.path.extsep)[-1]
-            parser = PARSERS[extension]
-
-            # prepare the parser arguments
-            files_iter = [
-                (filesystem, mzml_file.name, parser)
-                for mzml_file in sorted(mzml_files, key=lambda f: f.name)
-            ]
-
-            # wrap in a progress bar if needed
-            if not verbose and tqdm is not None:
-                files_iter = tqdm.tqdm(files_iter)
-
-            # parse using threads if needed
-            if jobs > 1:
-                with contextlib.closing(multiprocessing.pool.ThreadPool(jobs)) as pool:
-                    metalist = pool.map(_parse_file, files_iter)
-            else:
-                metalist = list(map(_parse_file, files_iter))
+            extension = mzml_files[0].rpartition(os.path.extsep)[2]
+            parser = _PARSERS[extension]
+
+            with contextlib.ExitStack() as ctx:
+                # extract the files if they are not on the local disk (e.g.
+                # in an archive), lazily, so that files are parsed while the
+                # next ones are being extracted; either way, workers are
+                # only given the system path of the directory to read, since
+                # the filesystem itself (possibly given by the caller) may
+                # not be picklable
+                if filesystem.hassyspath(mzml_files[0]):
+                    files = enumerate(mzml_files)
+                    root = filesystem.getsyspath("/")
+                else:
+                    tmp_fs = ctx.enter_context(fs.tempfs.TempFS("-mzml2isa"))
+                    files = _extract(filesystem, tmp_fs, mzml_files, stored_files)
+                    filesystem, root = tmp_fs, tmp_fs.getsyspath("/")
+
+                # parse using processes if needed, sending files to the
+                # workers in chunks and collecting the results as soon as
+                # they are produced, whatever their order (a single file
+                # is parsed in place, and no more workers than files are
+                # started, since each worker has to be spawned)
+                jobs = min(jobs, len(mzml_files))
+                if jobs > 1:
+                    # NB: forked workers inherit the vocabularies loaded
+                    #     here, instead of each reading them again
+                    if multiprocessing.get_start_method() == "fork":
+                        MzMLFile._default_vocabulary()
+                        parser._default_vocabulary()
+                    initargs = (root, parser, list(warnings.filters))
+                    pool = multiprocessing.Pool(jobs, _init_worker, initargs)
+                    ctx.enter_context(pool)
+                    chunksize = max(1, len(mzml_files) // (jobs * 4))
+                    results = pool.imap_unordered(
+                        _parse_worker_file, files, chunksize
+                    )
+                else:
+                    results = (
+                        (index, _parse_file((filesystem, name, parser)))
+                        for index, name in _readahead(filesystem, files)
+                    )
+
+                # wrap in a progress bar if needed
+                if not verbose and tqdm is not None:
+                    results = tqdm.tqdm(results, total=len(mzml_files))
+
+                # restore the order of the files
+                indexed = sorted(results, key=operator.itemgetter(0))
+                metalist = [meta for _, meta in indexed]
 
             # merge spectra if needed
             if merge and extension == "imzML":
@@ -159,7 +287,7 @@ def main(argv=None):
             with (if None, then sys.argv is used) [default: None]
     """
     p = argparse.ArgumentParser(
-        prog=__name__,
+        prog=__package__,
         formatter_class=argparse.RawDescriptionHelpFormatter,
         description="""Extract meta information from (i)mzML files and create ISA-tab structure""",
         usage="mzml2isa -i IN_PATH -o OUT_PATH -s STUDY_ID [options]",
@@ -18,17 +18,26 @@ GNU General Public License version 3.0 (GPLv3)
 """
 
 import collections
+import difflib
 import functools
 import itertools
+import operator
 import string
 
 from . import __author__, __name__, __version__, __license__
 
 
 ## VERSION AGNOSTIC UTILS
+# object: a marker for a field that could not be found while formatting.
+_MISSING = object()
+
+
 class PermissiveFormatter(string.Formatter):
     """A formatter that replace wrong and missing key with a blank."""
 
+    _super_get_field = string.Formatter.get_field
+    _super_format_field = string.Formatter.format_field
+
     def __init__(self, missing="", bad_fmt=""):
         self.missing = missing
         self.bad_fmt = bad_fmt
@@ -36,17 +45,18 @@ class PermissiveFormatter(string.Formatter):
     def get_field(self, field_name, args, kwargs):
         # Handle a key not found
         try:
-            val = super(PermissiveFormatter, self).get_field(field_name, args, kwargs)
+            val = self._super_get_field(field_name, args, kwargs)
         except (KeyError, AttributeError, IndexError, TypeError):
-            val = None, field_name
+            val = _MISSING, field_name
         return val
 
     def format_field(self, value, spec):
-        # handle an invalid format
-        if value == None:
+        # handle a missing field (or a field explicitly set to `None`)
+        if value is _MISSING or value is None:
             return self.missing
+        # handle an invalid format
         try:
-            return super(PermissiveFormatter, self).format_field(value, spec)
+            return self._super_format_field(value, spec)
         except ValueError:
             if self.bad_fmt is not None:
                 return self.bad_fmt
@@ -58,21 +68,23 @@ def merge_spectra(metalist):
     """Merge centroid and spectrum metadata of a same sample
     """
 
-    # collect the list of centroid and profile samples
+    # collect the list of centroid and profile samples, along with
+    # their sample name so that it is only looked up once
     profiles, centroid = [], []
     for m in metalist:
         spec = m['Spectrum representation']
         name = spec['entry_list'][0]['name'] if 'entry_list' in spec else spec['name']
         if name == 'profile spectrum':
-            profiles.append(m)
+            profiles.append((m["Sample Name"]["value"], m))
         elif name == 'centroid spectrum':
-            centroid.append(m)
+            centroid.append((m["Sample Name"]["value"], m))
         else:
             raise ValueError('unknown spectrum representation: "{}"'.format(name))
 
-    # sort them by sample name
-    profiles.sort(key=lambda x: x["Sample Name"]["value"])
-    centroid.sort(key=lambda x: x["Sample Name"]["value"])
+    # sort them by sample name (stable, so samples with the same name
+    # stay in their original order)
+    profiles.sort(key=operator.itemgetter(0))
+    centroid.sort(key=operator.itemgetter(0))
 
     # check there are as many centroid as spectrum, or else we cannot
     # merge the samples
@@ -80,7 +92,7 @@ def merge_spectra(metalist):
         return metalist
 
     # merge the centroid metadata into the profile metadata
-    for p, c in zip(profiles, centroid):
+    for (p_name, p), (c_name, c) in zip(profiles, centroid):
         p["Derived Spectral Data File"]["entry_list"].extend(
             c["Derived Spectral Data File"]["entry_list"]
         )
@@ -90,27 +102,22 @@ def merge_spectra(metalist):
         p["Spectrum representation"]["entry_list"].extend(
             c["Spectrum representation"]["entry_list"]
         )
-        p["Sample Name"]["value"] = longest_substring(
-            p["Sample Name"]["value"], c["Sample Name"]["value"]
-        ).strip("-_;:() \n\t")
+        p["Sample Name"]["value"] = longest_substring(p_name, c_name).strip(
+            "-_;:() \n\t"
+        )
         p["MS Assay Name"]["value"] = p["Sample Name"]["value"]
 
-    return profiles
+    return [p for _, p in profiles]
 
 
 def longest_substring(string1, string2):
-    answer = ""
-    len1, len2 = len(string1), len(string2)
-    for i in range(len1):
-        match = ""
-        for j in range(len2):
-            if i + j < len1 and string1[i + j] == string2[j]:
-                match += string2[j]
-            else:
-                if len(match) > len(answer):
-                    answer = match
-                match = ""
-    return answer
+    """Return the longest common substring of two strings.
+
+    If there are several, the one starting first in ``string1`` is returned.
+    """
+    matcher = difflib.SequenceMatcher(None, string1, string2, autojunk=False)
+    match = matcher.find_longest_match(0, len(string1), 0, len(string2))
+    return string1[match.a : match.a + match.size]
 
 
 def star_args(func):
@@ -0,0 +1,103 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gc
+import os
+import unittest
+import warnings
+from os.path import pardir
+
+import fs
+
+from mzml2isa._obo import Vocabulary
+from mzml2isa.mzml import MzMLFile
+
+
+class TestMzMLFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fs_examples = fs.open_fs(os.path.join(__file__, pardir, pardir, "examples"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fs_examples.close()
+
+    def setUp(self):
+        self.fs_mem = fs.open_fs("mem://")
+
+    def tearDown(self):
+        self.fs_mem.close()
+
+    def _parse_modified(self, example, name, *replacements):
+        text = self.fs_examples.opendir(example).readtext(name)
+        for old, new in replacements:
+            self.assertIn(old, text)
+            text = text.replace(old, new)
+        self.fs_mem.writetext(name, text)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return MzMLFile(self.fs_mem, name).metadata
+
+    def test_data_file_content_fallback(self):
+        # remove the file content description and the spectrum types, so
+        # that the data file content must be looked up in the spectra
+        metadata = self._parse_modified(
+            "hupo-psi-1",
+            "tiny1.mzML0.99.1.mzML",
+            (
+                '<cvParam cvLabel="MS" accession="MS:1000580" name="MSn spectrum" value=""/>\n\t\t</fileContent>',
+                "</fileContent>",
+            ),
+            (
+                'accession="MS:1000580" name="MSn spectrum"',
+                'accession="MS:1000130" name="positive scan"',
+            ),
+        )
+        self.assertEqual(metadata["Data file content"], {"entry_list": []})
+        self.assertEqual(metadata["Scan polarity"]["name"], "positive scan")
+
+    def test_duplicate_software_id(self):
+        # give the second software the ID of the first one: references to
+        # that ID must still resolve to the first software of the list
+        metadata = self._parse_modified(
+            "metabolomics_study",
+            "1_samp.mzML",
+            ('<software id="pwiz"', '<software id="Xcalibur"'),
+        )
+        self.assertEqual(metadata["Instrument software"]["name"], "Xcalibur")
+        self.assertEqual(
+            metadata["Instrument software version"], {"value": "1.1 Beta 7"}
+        )
+
+    def test_binary_data_dropped(self):
+        mzml = MzMLFile(self.fs_examples.opendir("metabolomics_study"), "1_samp.mzML")
+        binaries = list(mzml.tree.iterfind(".//s:binary", mzml.namespaces))
+        self.assertTrue(binaries)
+        self.assertTrue(all(binary.text is None for binary in binaries))
+
+    def test_tree_released(self):
+        example = self.fs_examples.opendir("metabolomics_study")
+        MzMLFile(example, "1_samp.mzML").metadata
+        gc.collect()
+        gc.disable()
+        try:
+            MzMLFile(example, "1_samp.mzML").metadata
+            self.assertEqual(gc.collect(), 0)
+        finally:
+            gc.enable()
+
+    def test_vocabulary_memo_released(self):
+        with fs.open_fs("temp://") as fs_tmp:
+            fs_tmp.writetext(
+                "ms.obo", "[Term]\nid: MS:1000031\nname: instrument model\n"
+            )
+            vocabulary = Vocabulary(fs_tmp.getsyspath("ms.obo"))
+        self.fs_mem.writetext("empty.mzML", "")
+        mzml = MzMLFile(self.fs_mem, "empty.mzML", vocabulary=vocabulary)
+        self.assertEqual(mzml._get_term_name("MS:1000031"), "instrument model")
+        key = id(vocabulary)
+        self.assertIn(key, MzMLFile._VOCABULARY_MEMOS)
+        del mzml, vocabulary
+        gc.collect()
+        self.assertNotIn(key, MzMLFile._VOCABULARY_MEMOS)
@@ -0,0 +1,53 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+import warnings
+
+from mzml2isa import ontologies
+from mzml2isa._impl import importlib_resources
+from mzml2isa._obo import Vocabulary
+
+try:
+    import pronto
+except ImportError:
+    pronto = None
+
+
+@unittest.skipUnless(pronto, "pronto is not installed")
+class TestVocabulary(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with importlib_resources.path(ontologies.__name__, "psi-ms.obo") as filename:
+            cls.vocabulary = Vocabulary(filename)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                cls.ontology = pronto.Ontology(filename)
+
+    def test_terms(self):
+        terms = [t for t in self.ontology.terms() if t.id in self.vocabulary]
+        self.assertEqual(len(terms), len(self.vocabulary))
+        for term in terms:
+            self.assertEqual(self.vocabulary.get_term(term.id).name, term.name)
+
+    def test_missing_term(self):
+        self.assertRaises(KeyError, self.vocabulary.get_term, "MS:9999999")
+
+    def test_subclasses(self):
+        for id_ in ("MS:1000031", "MS:1000524", "MS:1000525", "MS:1000443"):
+            term, expected = self.vocabulary.get_term(id_), self.ontology.get_term(id_)
+            for with_self in (True, False):
+                for distance in (None, 1):
+                    self.assertEqual(
+                        [t.id for t in term.subclasses(distance, with_self)],
+                        [t.id for t in expected.subclasses(distance, with_self)],
+                    )
+
+    def test_superclasses(self):
+        for id_ in self.ontology.get_term("MS:1000031").subclasses().to_set().ids:
+            term, expected = self.vocabulary.get_term(id_), self.ontology.get_term(id_)
+            self.assertEqual(
+                [t.id for t in term.superclasses(with_self=False)],
+                [t.id for t in expected.superclasses(with_self=False)],
+            )
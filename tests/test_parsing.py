@@ -0,0 +1,105 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import multiprocessing
+import os
+import unittest
+import warnings
+from os.path import pardir
+from unittest import mock
+
+import fs
+import fs.copy
+
+from mzml2isa.parsing import convert
+
+
+class TestConvert(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fs_examples = fs.open_fs(os.path.join(__file__, pardir, pardir, "examples"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fs_examples.close()
+
+    def setUp(self):
+        self.fs_tmp = fs.open_fs("temp://")
+
+    def tearDown(self):
+        self.fs_tmp.close()
+
+    def _convert(self, example_name, out_dir, **kwargs):
+        in_path = self.fs_examples.getsyspath(example_name)
+        out_fs = self.fs_tmp.makedir(out_dir)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            convert(in_path, out_fs.getsyspath("/"), "MTBLS0", verbose=False, **kwargs)
+        return out_fs
+
+    def test_jobs(self):
+        serial = self._convert("metabolomics_study", "serial")
+        parallel = self._convert("metabolomics_study", "parallel", jobs=2)
+        self.assertEqual(sorted(serial.listdir("/")), sorted(parallel.listdir("/")))
+        for name in serial.listdir("/"):
+            self.assertEqual(serial.readtext(name), parallel.readtext(name), name)
+
+    def test_jobs_spawn(self):
+        serial = self._convert("hupo-psi-1", "serial")
+        out_fs = self.fs_tmp.makedir("spawn")
+        spawn = multiprocessing.get_context("spawn")
+        with mock.patch("multiprocessing.Pool", spawn.Pool), mock.patch(
+            "multiprocessing.get_start_method", return_value="spawn"
+        ):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                convert(
+                    fs.open_fs(self.fs_examples.getsyspath("hupo-psi-1")),
+                    out_fs.getsyspath("/"),
+                    "MTBLS0",
+                    jobs=2,
+                    verbose=False,
+                )
+        self.assertEqual(sorted(serial.listdir("/")), sorted(out_fs.listdir("/")))
+        for name in serial.listdir("/"):
+            self.assertEqual(serial.readtext(name), out_fs.readtext(name), name)
+
+    def test_archive(self):
+        directory = self._convert("metabolomics_study", "directory")
+        archive = self.fs_tmp.getsyspath("study.zip")
+        with fs.open_fs("zip://{}".format(archive), create=True) as zip_fs:
+            fs.copy.copy_fs(self.fs_examples.opendir("metabolomics_study"), zip_fs)
+        for jobs in (1, 2):
+            out_fs = self.fs_tmp.makedir("archive{}".format(jobs))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                convert(
+                    "zip://{}".format(archive),
+                    out_fs.getsyspath("/"),
+                    "MTBLS0",
+                    jobs=jobs,
+                    verbose=False,
+                )
+            for name in directory.listdir("/"):
+                self.assertEqual(directory.readtext(name), out_fs.readtext(name), name)
+
+    def test_jobs_single_file(self):
+        in_fs = self.fs_tmp.makedir("single")
+        in_fs.writebytes(
+            "1_samp.mzML",
+            self.fs_examples.readbytes("metabolomics_study/1_samp.mzML"),
+        )
+        out_fs = self.fs_tmp.makedir("out")
+        with mock.patch("multiprocessing.Pool") as pool:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                convert(
+                    in_fs.getsyspath("/"),
+                    out_fs.getsyspath("/"),
+                    "MTBLS0",
+                    jobs=4,
+                    verbose=False,
+                )
+        pool.assert_not_called()
+        self.assertTrue(out_fs.listdir("/"))
@@ -0,0 +1,137 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import unittest
+import warnings
+
+import fs
+import openpyxl
+
+from mzml2isa.usermeta import UserMetaLoader
+
+
+class TestUserMetaLoader(unittest.TestCase):
+    usermeta = {
+        "investigation": {"identifier": "MTBLS0", "title": "Étude"},
+        "study": {"title": "A study"},
+    }
+
+    def test_json_string(self):
+        loader = UserMetaLoader(json.dumps(self.usermeta))
+        self.assertEqual(loader.usermeta, self.usermeta)
+
+    def test_json_file(self):
+        with fs.open_fs("temp://") as fs_tmp:
+            fs_tmp.writetext("usermeta.json", json.dumps(self.usermeta), "utf-8")
+            loader = UserMetaLoader(fs_tmp.getsyspath("usermeta.json"))
+        self.assertEqual(loader.usermeta, self.usermeta)
+
+    def test_json_string_invalid(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            loader = UserMetaLoader("{not json")
+        self.assertIsNone(loader.usermeta)
+        self.assertEqual(len(caught), 1)
+
+    def test_json_file_invalid(self):
+        with fs.open_fs("temp://") as fs_tmp:
+            fs_tmp.writetext("usermeta.json", "{not json")
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                loader = UserMetaLoader(fs_tmp.getsyspath("usermeta.json"))
+        self.assertIsNone(loader.usermeta)
+        self.assertEqual(len(caught), 1)
+
+    def test_json_file_missing(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            loader = UserMetaLoader("/nonexistent/usermeta.json")
+        self.assertIsNone(loader.usermeta)
+        self.assertEqual(len(caught), 1)
+
+    def _load_xlsx(self, rows):
+        with fs.open_fs("temp://") as fs_tmp:
+            path = fs_tmp.getsyspath("usermeta.xlsx")
+            workbook = openpyxl.Workbook()
+            for row in rows:
+                workbook.worksheets[0].append(row)
+            workbook.save(path)
+            return UserMetaLoader(path).usermeta
+
+    def test_xlsx_file(self):
+        with fs.open_fs("temp://") as fs_tmp:
+            UserMetaLoader.dump_template_xlsx(fs_tmp.getsyspath("/"))
+            path = fs_tmp.getsyspath("usermeta.xlsx")
+            workbook = openpyxl.load_workbook(path)
+            sheet = workbook.worksheets[0]
+            values = {"Investigation Identifier": "MTBLS0", "Study Title": "A study"}
+            for (cell,) in sheet.iter_rows(max_col=1):
+                if cell.value in values:
+                    sheet.cell(cell.row, 2, values[cell.value])
+            workbook.save(path)
+            loader = UserMetaLoader(path)
+        self.assertEqual(loader.usermeta["investigation"]["identifier"], "MTBLS0")
+        self.assertEqual(loader.usermeta["study"]["title"], "A study")
+
+    def test_xlsx_nested(self):
+        usermeta = self._load_xlsx(
+            [
+                ["Organism Name", "Homo sapiens"],
+                ["Organism Accession Number", "NCBITaxon:9606"],
+            ]
+        )
+        self.assertEqual(
+            usermeta["characteristics"],
+            {"organism": {"name": "Homo sapiens", "accession": "NCBITaxon:9606"}},
+        )
+
+    def test_xlsx_multiple_values(self):
+        usermeta = self._load_xlsx(
+            [
+                ["Study Contacts First Name", "Jane", "John"],
+                ["Study Contacts Last Name", "Doe", "Smith"],
+                ["Study Contacts Role Name", "author", "submitter"],
+                ["Investigation Contacts First Name", "Jane"],
+            ]
+        )
+        self.assertEqual(
+            usermeta["study_contacts"],
+            [
+                {"first_name": "Jane", "last_name": "Doe", "roles": {"name": "author"}},
+                {
+                    "first_name": "John",
+                    "last_name": "Smith",
+                    "roles": {"name": "submitter"},
+                },
+            ],
+        )
+        self.assertEqual(usermeta["investigation_contacts"], [{"first_name": "Jane"}])
+
+    def test_xlsx_empty_multiple_values(self):
+        usermeta = self._load_xlsx(
+            [
+                ["Study Contacts First Name", "Jane", None, None, "John"],
+                ["Study Contacts Role Name", "author", "submitter", None, None],
+            ]
+        )
+        self.assertEqual(
+            usermeta["study_contacts"],
+            [
+                {"first_name": "Jane", "roles": {"name": "author"}},
+                {"first_name": "John"},
+            ],
+        )
+
+    def test_xlsx_skipped_rows(self):
+        usermeta = self._load_xlsx(
+            [
+                ["#### STUDY ####"],
+                [None, "orphan value"],
+                [42, "numeric header"],
+                ["Study Title", "A study"],
+                ["Study Description"],
+            ]
+        )
+        self.assertEqual(usermeta, {"study": {"title": "A study"}})
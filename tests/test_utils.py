@@ -0,0 +1,84 @@
+# coding: utf-8
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mzml2isa.utils import PermissiveFormatter, longest_substring, merge_spectra
+
+
+class TestPermissiveFormatter(unittest.TestCase):
+    def test_missing_field(self):
+        fmt = PermissiveFormatter(missing="?")
+        self.assertEqual(fmt.format("{a}-{b[c]}", a=1, b={}), "1-?")
+
+    def test_none_field(self):
+        fmt = PermissiveFormatter(missing="?")
+        self.assertEqual(fmt.format("{a}", a=None), "?")
+
+    def test_bad_format(self):
+        fmt = PermissiveFormatter(bad_fmt="!")
+        self.assertEqual(fmt.format("{a:d}", a="x"), "!")
+
+
+class TestLongestSubstring(unittest.TestCase):
+    def test_common_prefix(self):
+        self.assertEqual(
+            longest_substring("Sample1_profile", "Sample1_centroid"), "Sample1_"
+        )
+
+    def test_common_suffix(self):
+        self.assertEqual(longest_substring("profile_S1", "centroid_S1"), "_S1")
+
+    def test_inner_substring(self):
+        self.assertEqual(longest_substring("xxabcyy", "abczz"), "abc")
+        self.assertEqual(longest_substring("abczz", "xxabcyy"), "abc")
+
+    def test_identical(self):
+        self.assertEqual(longest_substring("abc", "abc"), "abc")
+
+    def test_tie(self):
+        self.assertEqual(longest_substring("ab-cd", "cd-ab"), "ab")
+
+    def test_no_common_substring(self):
+        self.assertEqual(longest_substring("abc", "xyz"), "")
+        self.assertEqual(longest_substring("", "abc"), "")
+
+
+class TestMergeSpectra(unittest.TestCase):
+    @staticmethod
+    def _meta(name, representation):
+        return {
+            "Sample Name": {"value": name},
+            "MS Assay Name": {"value": name},
+            "Spectrum representation": {"entry_list": [{"name": representation}]},
+            "Raw Spectral Data File": {"entry_list": [{"value": name + ".imzML"}]},
+            "Derived Spectral Data File": {"entry_list": [{"value": name + ".ibd"}]},
+        }
+
+    def test_merge(self):
+        metalist = [
+            self._meta("S2_centroid", "centroid spectrum"),
+            self._meta("S1_profile", "profile spectrum"),
+            self._meta("S1_centroid", "centroid spectrum"),
+            self._meta("S2_profile", "profile spectrum"),
+        ]
+        merged = merge_spectra(metalist)
+        self.assertEqual([m["Sample Name"]["value"] for m in merged], ["S1", "S2"])
+        self.assertEqual([m["MS Assay Name"]["value"] for m in merged], ["S1", "S2"])
+        self.assertEqual(
+            merged[0]["Raw Spectral Data File"]["entry_list"],
+            [{"value": "S1_profile.imzML"}, {"value": "S1_centroid.imzML"}],
+        )
+
+    def test_unbalanced(self):
+        metalist = [
+            self._meta("S1_profile", "profile spectrum"),
+            self._meta("S1_centroid", "centroid spectrum"),
+            self._meta("S2_profile", "profile spectrum"),
+        ]
+        self.assertIs(merge_spectra(metalist), metalist)
+
+    def test_unknown_representation(self):
+        metalist = [self._meta("S1", "spectrum")]
+        self.assertRaises(ValueError, merge_spectra, metalist)